@@ -5,8 +5,7 @@
 import os
 import re
 import sys
-from configparser import ConfigParser, ExtendedInterpolation
-from io import StringIO
+from configparser import ConfigParser, ExtendedInterpolation, Error as ConfigParserError
 from . import version
 from .util import Util
 from .chain import Chain
@@ -14,6 +13,18 @@ from .chain import Chain
 log = Util.get_log('ETL')
 
 
+def run_chain(chain_str, configdict, config_dir):
+    """
+    Assemble and run a single Chain, used as a multiprocessing worker.
+    """
+    if config_dir not in sys.path:
+        sys.path.append(config_dir)
+
+    chain = Chain(chain_str, configdict)
+    chain.assemble()
+    chain.run()
+
+
 class ETL:
     """The main class: builds ETL Chains with connected Components from a config and let them run.
 
@@ -53,12 +64,11 @@ class ETL:
         try:
             # Get config file as string
             log.info("Reading config_file = %s" % config_file)
-            f = open(config_file, 'r')
-            config_str = f.read()
-            f.close()
-        except Exception as e:
+            with open(config_file, 'r') as f:
+                config_str = f.read()
+        except (OSError, UnicodeDecodeError) as e:
             log.error("Cannot read config file: err=%s" % str(e))
-            raise e
+            raise
 
         args_names = list()
         try:
@@ -97,14 +107,11 @@ class ETL:
             raise e
 
         try:
-            # Put Config string into buffer (readfp() needs a readline() method)
-            config_buf = StringIO(config_str)
-
-            # Parse config from file buffer
-            self.configdict.read_file(config_buf, config_file)
-        except Exception as e:
+            # Parse config from the (substituted) config string
+            self.configdict.read_string(config_str, source=config_file)
+        except ConfigParserError as e:
             log.error("Error populating config dict from config string: err=%s" % str(e))
-            raise e
+            raise
 
     def env_expand_args_dict(self, args_dict, args_names):
         """
@@ -148,13 +155,25 @@ class ETL:
 
         # Multiple Chains may be specified in the config
         chains_str_arr = chains_str.split(',')
-        for chain_str in chains_str_arr:
-            # Build single Chain of components and let it run
-            chain = Chain(chain_str, self.configdict)
-            chain.assemble()
 
-            # Run the ETL for this Chain
-            chain.run()
+        # Optionally run independent Chains in parallel processes
+        chain_concurrency = self.configdict.getint(config_section, 'chain_concurrency', fallback=1)
+        if chain_concurrency > 1 and len(chains_str_arr) > 1:
+            import multiprocessing
+            # No more worker processes than there are Chains to run
+            chain_concurrency = min(chain_concurrency, len(chains_str_arr))
+            log.info("Running %d chains with concurrency %d" % (len(chains_str_arr), chain_concurrency))
+            with multiprocessing.Pool(chain_concurrency) as pool:
+                pool.starmap(run_chain,
+                             [(chain_str, self.configdict, ETL.CONFIG_DIR) for chain_str in chains_str_arr])
+        else:
+            for chain_str in chains_str_arr:
+                # Build single Chain of components and let it run
+                chain = Chain(chain_str, self.configdict)
+                chain.assemble()
+
+                # Run the ETL for this Chain
+                chain.run()
 
         Util.end_timer(t1, "total ETL")
 
@@ -2,7 +2,9 @@
 #
 # Author: Just van den Broecke 2021
 #
+import mmap
 import os.path
+import shutil
 from stetl.component import Config
 from stetl.filter import Filter
 from stetl.util import Util
@@ -11,6 +13,15 @@ from stetl.packet import FORMAT
 log = Util.get_log('archiveexpander')
 
 
+class _MmapFile(mmap.mmap):
+    """
+    Memory-mapped file usable as zipfile.ZipFile file object (which requires seekable()).
+    """
+
+    def seekable(self):
+        return True
+
+
 class ArchiveExpander(Filter):
     """
     Abstract Base Class.
@@ -57,17 +68,21 @@ class ArchiveExpander(Filter):
 
     def wipe_dir(self, dir_path):
         if os.path.isdir(dir_path):
-            for file_object in os.listdir(dir_path):
-                file_object_path = os.path.join(dir_path, file_object)
-                if os.path.isdir(file_object_path):
-                    self.wipe_dir(file_object_path)
-                    os.rmdir(file_object_path)
-                    return
-
-                os.remove(file_object_path)
+            # Remove the contents but keep the dir itself.
+            # scandir() entries carry the file type, saving a stat() per entry
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                    else:
+                        os.remove(entry.path)
 
-    def expand_archive(self, packet):
+    def expand_archive(self, file_path):
+        """
+        Expand the archive into the target dir, returns the number of expanded files.
+        """
         log.error('Only classes derived from ArchiveExpander can be used!')
+        return 0
 
     def invoke(self, packet):
 
@@ -81,14 +96,17 @@ class ArchiveExpander(Filter):
         self.input_archive_file = packet.data
 
         # Let derived class provide archive expansion (.zip, .tar etc)
-        self.expand_archive(self.input_archive_file)
-        if not os.listdir(self.target_dir):
+        file_count = self.expand_archive(self.input_archive_file)
+        if file_count is None:
+            # Derived class does not report the number of expanded files
+            file_count = len(os.listdir(self.target_dir))
+
+        if file_count == 0:
             log.warn('No expanded files in {}'.format(self.target_dir))
             packet.data = None
             return packet
 
         # ASSERT: expanded files in target dir
-        file_count = len(os.listdir(self.target_dir))
         log.info('Expanded {} into {} OK - filecount={}'.format(
             self.input_archive_file, self.target_dir, file_count))
 
@@ -114,6 +132,17 @@ class ZipArchiveExpander(ArchiveExpander):
     consumes=FORMAT.string, produces=FORMAT.string
     """
 
+    # Start attribute config meta
+
+    @Config(ptype=int, default=1, required=False)
+    def extract_concurrency(self):
+        """
+        Number of threads extracting archive members in parallel, 1 means sequential.
+        """
+        pass
+
+    # End attribute config meta
+
     def __init__(self, configdict, section):
         ArchiveExpander.__init__(self, configdict, section, consumes=FORMAT.string, produces=FORMAT.string)
 
@@ -122,6 +151,44 @@ class ZipArchiveExpander(ArchiveExpander):
         import zipfile
         if not file_path.lower().endswith('zip'):
             log.warn('No zipfile passed: {}'.format(file_path))
-            return
-
-        zipfile.ZipFile(file_path).extractall(path=self.target_dir)
+            return 0
+
+        if os.path.getsize(file_path) == 0:
+            log.warn('Empty zipfile passed: {}'.format(file_path))
+            return 0
+
+        # Memory-map the archive: zipfile reads directory entries and member data
+        # from the mapped pages instead of via buffered read() calls.
+        with open(file_path, 'rb') as f:
+            with _MmapFile(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+
+                with zipfile.ZipFile(mm) as z:
+                    if self.extract_concurrency <= 1:
+                        z.extractall(path=self.target_dir)
+                    else:
+                        self.extract_members_concurrent(z)
+
+                    # Count from the already parsed archive directory, no need to scan the target dir
+                    return len([zinfo for zinfo in z.infolist() if not zinfo.is_dir()])
+
+    def extract_members_concurrent(self, z):
+        from concurrent.futures import ThreadPoolExecutor
+
+        members = z.infolist()
+
+        # Create the member directories up front, as concurrent creation may race.
+        # Directory names are sanitized the same way as in ZipFile.extract().
+        member_dirs = set()
+        for member in members:
+            member_dir = os.path.splitdrive(os.path.dirname(member.filename))[1]
+            member_dir = [part for part in member_dir.split('/') if part not in ('', os.path.curdir, os.path.pardir)]
+            member_dirs.add(os.path.join(self.target_dir, *member_dir))
+
+        for member_dir in member_dirs:
+            os.makedirs(member_dir, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=self.extract_concurrency) as executor:
+            # Consume results such that any extraction error is raised here
+            list(executor.map(lambda member: z.extract(member, path=self.target_dir), members))
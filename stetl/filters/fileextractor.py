@@ -4,7 +4,13 @@
 # Author: Just van den Broecke (generic and VsiFileExtractor)
 # Author: Frank Steggink (ZipFileExtractor)
 #
+import io
+import mmap
 import os.path
+import shutil
+import struct
+import zipfile
+import zlib
 from stetl.component import Config
 from stetl.filter import Filter
 from stetl.util import Util
@@ -12,7 +18,45 @@ from stetl.packet import FORMAT
 
 log = Util.get_log('fileextractor')
 
-DEFAULT_BUFFER_SIZE = 1024 * 1024 * 1024
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+class _VsiRawIO(io.RawIOBase):
+    """
+    Minimal read-only file object around a GDAL VSI file handle,
+    such that it can be streamed with e.g. shutil.copyfileobj().
+    """
+
+    def __init__(self, vsi):
+        from stetl.util import gdal
+        self.gdal = gdal
+        self.vsi = vsi
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            return self.readall()
+
+        # Return the VSIFReadL() buffer as is, RawIOBase.read() would copy it twice via readinto()
+        buffer = self.gdal.VSIFReadL(1, size, self.vsi)
+        if not buffer:
+            return b''
+
+        self.bytes_read += len(buffer)
+        return buffer
+
+    def readinto(self, buf):
+        buffer = self.gdal.VSIFReadL(1, len(buf), self.vsi)
+        if not buffer:
+            return 0
+
+        read_len = len(buffer)
+        buf[:read_len] = buffer
+        self.bytes_read += read_len
+        return read_len
 
 
 class FileExtractor(Filter):
@@ -46,6 +90,16 @@ class FileExtractor(Filter):
         """
         pass
 
+    @Config(ptype=bool, default=False, required=False)
+    def preallocate(self):
+        """
+        Reserve the disk space for the extracted file up front, where the file size is known?
+        Off by default: on filesystems without native fallocate support, like NFS before v4.2
+        or AWS EFS, glibc emulates posix_fallocate() by writing a byte to every 4 KiB block,
+        making the extraction slower instead of faster.
+        """
+        pass
+
     # End attribute config meta
 
     # Constructor
@@ -59,6 +113,16 @@ class FileExtractor(Filter):
     def extract_file(self, packet):
         log.error('Only classes derived from FileExtractor can be used!')
 
+    def preallocate_file(self, f, size):
+        # Reserve the disk space for the extracted file in one go, where supported
+        if not self.preallocate or size <= 0 or not hasattr(os, 'posix_fallocate'):
+            return
+
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+        except OSError as e:
+            log.debug('Cannot preallocate {} bytes for {} err={}'.format(size, self.file_path, str(e)))
+
     def invoke(self, packet):
 
         if packet.data is None:
@@ -93,21 +157,115 @@ class ZipFileExtractor(FileExtractor):
     consumes=FORMAT.record, produces=FORMAT.string
     """
 
+    # Start attribute config meta
+
+    @Config(ptype=bool, default=True, required=False)
+    def zero_copy_extract(self):
+        """
+        Copy or decompress stored and deflated members directly from the memory-mapped ZIP file?
+        """
+        pass
+
+    # End attribute config meta
+
     def __init__(self, configdict, section):
         FileExtractor.__init__(self, configdict, section, consumes=FORMAT.record)
 
+        # Currently open ZIP file and its memory map. ZipFileInput delivers all files
+        # of an archive in sequence, so only the current archive is kept open.
+        self._zip_path = None
+        self._zip_file = None
+        self._zip_mmap = None
+
+    def exit(self):
+        self.close_zip()
+
+    def close_zip(self):
+        if self._zip_mmap is not None:
+            self._zip_mmap.close()
+            self._zip_mmap = None
+
+        if self._zip_file is not None:
+            self._zip_file.close()
+            self._zip_file = None
+
+        self._zip_path = None
+
+    def get_zip(self, file_path):
+        # Parse the ZIP central directory only once per archive
+        if file_path != self._zip_path:
+            self.close_zip()
+            self._zip_file = zipfile.ZipFile(file_path)
+            self._zip_path = file_path
+
+        return self._zip_file
+
+    def get_mmap(self, file_path):
+        self.get_zip(file_path)
+        if self._zip_mmap is None:
+            with open(file_path, 'rb') as f:
+                self._zip_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self._zip_mmap
+
     def extract_file(self, packet):
 
-        import zipfile
+        z = self.get_zip(packet.data['file_path'])
+        zinfo = z.getinfo(packet.data['name'])
+        with open(self.file_path, 'wb') as f:
+            self.preallocate_file(f, zinfo.file_size)
 
-        with zipfile.ZipFile(packet.data['file_path']) as z:
-            with open(self.file_path, 'wb') as f:
-                with z.open(packet.data['name']) as zf:
-                    while True:
-                        buffer = zf.read(self.buffer_size)
-                        if not buffer:
-                            break
+            # Encrypted members and other compression methods go via zipfile
+            if self.zero_copy_extract and not zinfo.flag_bits & 0x1 \
+                    and zinfo.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                self.extract_member_mmap(packet.data['file_path'], zinfo, f)
+                return
+
+            with z.open(zinfo) as zf:
+                # Reuse a single read buffer instead of a new bytes object per chunk.
+                buffer = memoryview(bytearray(self.buffer_size))
+                while True:
+                    read_len = zf.readinto(buffer)
+                    if not read_len:
+                        break
+                    f.write(buffer[:read_len])
+
+    def extract_member_mmap(self, file_path, zinfo, f):
+        mm = self.get_mmap(file_path)
+
+        # Member data follows the 30-byte local file header plus its variable length fields.
+        # These may differ from the central directory, so read them from the local header.
+        header = mm[zinfo.header_offset:zinfo.header_offset + 30]
+        if len(header) != 30 or header[0:4] != b'PK\x03\x04':
+            raise zipfile.BadZipFile('Bad local file header for {}'.format(zinfo.filename))
+
+        name_len, extra_len = struct.unpack('<HH', header[26:30])
+        data_offset = zinfo.header_offset + 30 + name_len + extra_len
+
+        crc = 0
+        with memoryview(mm)[data_offset:data_offset + zinfo.compress_size] as data:
+            if zinfo.compress_type == zipfile.ZIP_STORED:
+                crc = zlib.crc32(data)
+                f.write(data)
+            else:
+                # Raw DEFLATE stream, no zlib header
+                decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                for offset in range(0, len(data), self.buffer_size):
+                    chunk = data[offset:offset + self.buffer_size]
+
+                    # Bound the decompressed output per step: XML/GML inflates to many times its size
+                    while chunk:
+                        buffer = decompressor.decompress(chunk, self.buffer_size)
+                        crc = zlib.crc32(buffer, crc)
                         f.write(buffer)
+                        chunk = decompressor.unconsumed_tail
+
+                buffer = decompressor.flush()
+                crc = zlib.crc32(buffer, crc)
+                f.write(buffer)
+
+        if crc != zinfo.CRC:
+            raise zipfile.BadZipFile('Bad CRC-32 for file {}'.format(zinfo.filename))
 
 
 class VsiFileExtractor(FileExtractor):
@@ -120,6 +278,9 @@ class VsiFileExtractor(FileExtractor):
 
     See also stetl.inputs.fileinput.VsiZipFileInput that generates these paths.
 
+    With GDAL 3.7+ the file is copied by gdal.CopyFile(), which uses its own buffering:
+    buffer_size then only applies to older GDAL versions.
+
     Author: Just van den Broecke
 
     consumes=FORMAT.gdal_vsi_path, produces=FORMAT.string
@@ -137,22 +298,22 @@ class VsiFileExtractor(FileExtractor):
         vsi = None
         vsi_len = 0
         try:
-            # gdal.VSIF does not support 'with' so old-school open/close.
             log.info('Extracting {}'.format(vsi_file_path))
+            if hasattr(gdal, 'CopyFile'):
+                # GDAL 3.7+: let GDAL do the entire copy loop natively
+                if gdal.CopyFile(vsi_file_path, self.file_path) != 0:
+                    raise Exception('gdal.CopyFile failed')
+                vsi_len = os.path.getsize(self.file_path)
+                log.info('Extracted {} ok len={} bytes'.format(vsi_file_path, vsi_len))
+                return
+
+            # gdal.VSIF does not support 'with' so old-school open/close.
             vsi = gdal.VSIFOpenL(vsi_file_path, 'rb')
+            vsi_reader = _VsiRawIO(vsi)
             with open(self.file_path, 'wb') as f:
-                gdal.VSIFSeekL(vsi, 0, 2)
-                vsi_len = gdal.VSIFTellL(vsi)
-                gdal.VSIFSeekL(vsi, 0, 0)
-                read_size = self.buffer_size
-                if vsi_len < read_size:
-                    read_size = vsi_len
-
-                while True:
-                    buffer = gdal.VSIFReadL(1, read_size, vsi)
-                    if not buffer or len(buffer) == 0:
-                        break
-                    f.write(buffer)
+                # Stream until EOF: no need to determine the length up front.
+                shutil.copyfileobj(vsi_reader, f, self.buffer_size)
+            vsi_len = vsi_reader.bytes_read
 
         except Exception as e:
             log.error('Cannot extract {} err={}'.format(vsi_file_path, str(e)))
@@ -6,6 +6,7 @@
 # Author:Just van den Broecke
 
 import json
+import re
 from stetl.component import Config
 from stetl.util import Util, etree
 from stetl.filter import Filter
@@ -13,6 +14,12 @@ from stetl.packet import FORMAT
 
 log = Util.get_log("formatconverter")
 
+# XML declaration, compiled once as it is stripped for each converted packet
+XML_DECLARATION_RE = re.compile(r'<\?xml.*?\?>')
+
+# Read size for GDAL /vsi files
+VSI_READ_SIZE = 1024 * 1024
+
 
 class FormatConverter(Filter):
     """
@@ -251,25 +258,27 @@ class FormatConverter(Filter):
     @staticmethod
     def gdal_vsi_path2etree_doc(packet, converter_args=None):
         from stetl.util import gdal
-        import re
 
         # Example input path:
         # /vsizip/{/vsizip/{BAGGEM0221L-15022021.zip}/GEM-WPL-RELATIE-15022021.zip}/GEM-WPL-RELATIE-15022021-000001.xml
         vsi_file_path = packet.data
         vsi_file = gdal.VSIFOpenL(vsi_file_path, 'rb')
-        gdal.VSIFSeekL(vsi_file, 0, 2)
-        vsileng = gdal.VSIFTellL(vsi_file)
-        gdal.VSIFSeekL(vsi_file, 0, 0)
 
-        # read the XML as string (or bytearray)
-        xml_str = gdal.VSIFReadL(1, vsileng, vsi_file)
+        # read the XML as bytearray until EOF, no need to determine the length first
+        xml_str = bytearray()
+        try:
+            while True:
+                buffer = gdal.VSIFReadL(1, VSI_READ_SIZE, vsi_file)
+                if not buffer:
+                    break
+                xml_str += buffer
+        finally:
+            gdal.VSIFCloseL(vsi_file)
 
-        # Type is GDAL-version dependent, may be bytes-like
-        if type(xml_str) in [bytearray, bytes]:
-            xml_str = xml_str.decode('utf-8')
+        xml_str = xml_str.decode('utf-8')
 
         # Need to strip the XML header to avoid XML parse error
-        xml_str = re.sub(r'<\?xml.*?\?>', '', xml_str)
+        xml_str = XML_DECLARATION_RE.sub('', xml_str)
         packet.data = etree.fromstring(xml_str)
 
         return packet
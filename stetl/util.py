@@ -255,7 +255,7 @@ class Util:
 
                 # Create OGR Geometry object from GML string
                 value = etree.tostring(subelem)
-                if type(value) == bytes:
+                if isinstance(value, bytes):
                     value = value.decode('utf-8')
                 from osgeo import ogr
                 geom = ogr.CreateGeometryFromGML(value)
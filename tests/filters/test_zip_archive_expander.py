@@ -1,5 +1,6 @@
 from unittest import mock
 import os
+import shutil
 
 from stetl.etl import ETL
 from stetl.filters.archiveexpander import ZipArchiveExpander
@@ -16,6 +17,26 @@ class ZipArchiveExpanderTest(StetlTestCase):
         cfg_dict = {'config_file': os.path.join(self.curr_dir, 'configs/ziparchiveexpander.cfg')}
         self.etl = ETL(cfg_dict)
 
+    def assert_expanded_files(self, chain, expected_files):
+        # Check and remove the expanded files (relative paths) in the target dir
+        section = StetlTestCase.get_section(chain, 2)
+        target_dir = self.etl.configdict.get(section, 'target_dir')
+        self.assertTrue(os.path.exists(target_dir))
+
+        file_paths = []
+        for dir_path, dir_names, file_names in os.walk(target_dir):
+            for file_name in file_names:
+                file_paths.append(os.path.relpath(os.path.join(dir_path, file_name), target_dir))
+
+        self.assertEqual(sorted(expected_files), sorted(file_paths))
+
+        for file_object in os.listdir(target_dir):
+            file_object_path = os.path.join(target_dir, file_object)
+            if os.path.isdir(file_object_path):
+                shutil.rmtree(file_object_path)
+            else:
+                os.remove(file_object_path)
+
     def test_class(self):
         chain = StetlTestCase.get_chain(self.etl)
         section = StetlTestCase.get_section(chain, 2)
@@ -81,3 +102,47 @@ class ZipArchiveExpanderTest(StetlTestCase):
             self.assertTrue(os.path.exists(file_object_path))
             os.remove(file_object_path)
 
+    @mock.patch('stetl.outputs.standardoutput.StandardOutput.after_chain_invoke', autospec=True)
+    def test_execute_zip_concurrent(self, mock_after_chain_invoke):
+        chain = StetlTestCase.get_chain(self.etl, index=2)
+        chain.run()
+
+        # Same result as sequential expansion, members now extracted by multiple threads.
+        self.assertTrue(mock_after_chain_invoke.called)
+        self.assertEqual(2, mock_after_chain_invoke.call_count)
+
+        # 3 XML files in archive
+        self.assert_expanded_files(chain, ['0221LIG15092020-00000{}.xml'.format(i) for i in range(1, 4)])
+
+    @mock.patch('stetl.outputs.standardoutput.StandardOutput.after_chain_invoke', autospec=True)
+    def test_execute_zip_concurrent_subdirs(self, mock_after_chain_invoke):
+        chain = StetlTestCase.get_chain(self.etl, index=3)
+        chain.run()
+
+        self.assertEqual(2, mock_after_chain_invoke.call_count)
+
+        # Files in nested subdirs, archive has no directory entries
+        self.assert_expanded_files(chain, [
+            'top.xml',
+            os.path.join('dir1', 'a.xml'),
+            os.path.join('dir1', 'dir2', 'b.xml'),
+            os.path.join('dir1', 'dir2', 'c.xml'),
+            os.path.join('dir3', 'd.xml')
+        ])
+
+    def test_wipe_dir(self):
+        chain = StetlTestCase.get_chain(self.etl)
+        expander = chain.first_comp.next.next
+
+        # Several nested subdirs, all should be wiped, the dir itself is kept
+        wipe_dir = 'tests/data/temp/wipe_dir'
+        for sub_dir in ['a/b', 'c', 'd']:
+            os.makedirs(os.path.join(wipe_dir, sub_dir), exist_ok=True)
+            with open(os.path.join(wipe_dir, sub_dir, 'file.txt'), 'w') as f:
+                f.write('wipe me')
+
+        expander.wipe_dir(wipe_dir)
+
+        self.assertTrue(os.path.isdir(wipe_dir))
+        self.assertEqual(0, len(os.listdir(wipe_dir)))
+        os.rmdir(wipe_dir)
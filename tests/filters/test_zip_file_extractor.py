@@ -1,5 +1,7 @@
 from unittest import mock
 import os
+import shutil
+import zipfile
 
 from stetl.etl import ETL
 from stetl.filters.fileextractor import ZipFileExtractor
@@ -50,8 +52,91 @@ class ZipFileExtractorTest(StetlTestCase):
         self.assertTrue(mock_after_chain_invoke.called)
         self.assertEqual(3, mock_after_chain_invoke.call_count)
 
+        # Open ZipFile is closed at Chain exit
+        self.assertIsNone(chain.first_comp.next._zip_file)
+
+        # Check if temp file exists
+        section = StetlTestCase.get_section(chain, 1)
+        file_path = self.etl.configdict.get(section, 'file_path')
+        self.assertTrue(os.path.exists(file_path))
+        os.remove(file_path)
+
+    @mock.patch('stetl.filters.fileextractor.ZipFileExtractor.after_chain_invoke', autospec=True)
+    def test_execute_no_zero_copy(self, mock_after_chain_invoke):
+        chain = StetlTestCase.get_chain(self.etl, index=1)
+        chain.run()
+
+        # Same as test_execute, now reading the members via zipfile.
+        self.assertTrue(mock_after_chain_invoke.called)
+        self.assertEqual(3, mock_after_chain_invoke.call_count)
+
         # Check if temp file exists
         section = StetlTestCase.get_section(chain, 1)
         file_path = self.etl.configdict.get(section, 'file_path')
         self.assertTrue(os.path.exists(file_path))
         os.remove(file_path)
+
+    def test_execute_multiple_archives(self):
+        # More archives than kept open: only the current archive may be open
+        zips_dir = 'tests/data/temp/zips'
+        os.makedirs(zips_dir, exist_ok=True)
+        for i in range(5):
+            with zipfile.ZipFile(os.path.join(zips_dir, 'archive{}.zip'.format(i)), 'w') as z:
+                z.writestr('file1.txt', 'archive {} file 1'.format(i))
+                z.writestr('file2.txt', 'archive {} file 2'.format(i))
+
+        zip_files = []
+
+        def check_open_archives(extractor, packet):
+            if extractor._zip_file not in zip_files:
+                zip_files.append(extractor._zip_file)
+
+            for zip_file in zip_files[:-1]:
+                self.assertIsNone(zip_file.fp)
+
+        try:
+            chain = StetlTestCase.get_chain(self.etl, index=2)
+            with mock.patch('stetl.filters.fileextractor.ZipFileExtractor.after_chain_invoke',
+                            autospec=True, side_effect=check_open_archives) as mock_after_chain_invoke:
+                chain.run()
+
+            # 10 files plus final call
+            self.assertEqual(11, mock_after_chain_invoke.call_count)
+            self.assertEqual(5, len(zip_files))
+            for zip_file in zip_files:
+                self.assertIsNone(zip_file.fp)
+        finally:
+            shutil.rmtree(zips_dir)
+
+    @mock.patch('stetl.filters.fileextractor.ZipFileExtractor.after_chain_invoke', autospec=True)
+    def test_execute_small_buffer(self, mock_after_chain_invoke):
+        chain = StetlTestCase.get_chain(self.etl, index=3)
+        chain.run()
+
+        self.assertEqual(3, mock_after_chain_invoke.call_count)
+
+        # Decompressed output per step is bounded by buffer_size, content of the preallocated file must be complete
+        section = StetlTestCase.get_section(chain, 1)
+        file_path = self.etl.configdict.get(section, 'file_path')
+        with zipfile.ZipFile('tests/data/zipfileinput.zip') as z:
+            expected = z.read('top10nl-source.gml')
+        with open(file_path, 'rb') as f:
+            self.assertEqual(expected, f.read())
+        os.remove(file_path)
+
+    @mock.patch('stetl.filters.fileextractor.ZipFileExtractor.after_chain_invoke', autospec=True)
+    def test_execute_stored(self, mock_after_chain_invoke):
+        chain = StetlTestCase.get_chain(self.etl, index=4)
+        chain.run()
+
+        self.assertEqual(2, mock_after_chain_invoke.call_count)
+
+        # Stored file is copied as is from the memory-mapped archive
+        section = StetlTestCase.get_section(chain, 1)
+        file_path = self.etl.configdict.get(section, 'file_path')
+        with zipfile.ZipFile('tests/data/ziparchivenested.zip') as z:
+            self.assertEqual(zipfile.ZIP_STORED, z.getinfo('nested.zip').compress_type)
+            expected = z.read('nested.zip')
+        with open(file_path, 'rb') as f:
+            self.assertEqual(expected, f.read())
+        os.remove(file_path)
@@ -22,3 +22,20 @@ class ConfigTest(StetlTestCase):
 
     def test_run(self):
         self.etl.run()
+
+    def test_lone_dollar(self):
+        # A lone $ in a value is only an interpolation error when the value is read
+        curr_dir = os.path.dirname(os.path.realpath(__file__))
+        etl = ETL({'config_file': os.path.join(curr_dir, 'configs/copy_in_out_dollar.cfg')})
+        self.assertEqual(etl.configdict.get('input_xml_file', 'regex', raw=True), '^foo$')
+
+    def test_run_concurrent(self):
+        curr_dir = os.path.dirname(os.path.realpath(__file__))
+        etl = ETL({'config_file': os.path.join(curr_dir, 'configs/copy_in_out_concurrent.cfg')})
+        etl.run()
+
+        # Both Chains have run, each in its own process
+        for section in ['output_xml_file', 'output_gml_file']:
+            file_path = etl.configdict.get(section, 'file_path')
+            self.assertTrue(os.path.exists(file_path))
+            os.remove(file_path)